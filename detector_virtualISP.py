@@ -2,64 +2,176 @@
 
 import sys
 import re
+import csv
 import json
-import pandas as pd
-from typing import Dict, Tuple, Any
-
-RE_PHONE_STRICT = re.compile(r'(?<!\d)(?:\+?91[-\s]?)?([6-9]\d{9})(?!\d)')
-RE_AADHAR = re.compile(r'(?<!\d)(\d{4})[\s-]?(\d{4})[\s-]?(\d{4})(?!\d)')
-RE_PASSPORT_IN = re.compile(r'(?<![A-Za-z0-9])([A-PR-WYa-pr-wy])[ ]?(\d{7})(?![A-Za-z0-9])')
-RE_UPI = re.compile(r'([a-zA-Z0-9.\-_]{2,})@([a-zA-Z]{2,})')
-RE_EMAIL = re.compile(r'([a-zA-Z0-9._%+\-]{2,})@([A-Za-z0-9.\-]+\.[A-Za-z]{2,})')
-RE_IP = re.compile(r'\b((?:\d{1,3}\.){3}\d{1,3})\b')
+import os
+import functools
+import itertools
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Any, Callable, Deque, Dict, Iterator, List, Optional, Tuple
+
+_json_loads: Callable[[str], Any]
+try:
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:
+    _json_loads = json.loads
+
+try:
+    import re2  # type: ignore[import-untyped, import-not-found]
+except ImportError:
+    re2 = None
+
+RE_PHONE_STRICT = re.compile(r'(?<!\d)(?:\+?91[-\s]?)?(?P<phone_num>[6-9]\d{9})(?!\d)')
+RE_AADHAR = re.compile(r'(?<!\d)\d{4}[\s-]?\d{4}[\s-]?\d{4}(?!\d)')
+RE_PASSPORT_IN = re.compile(r'(?<![A-Za-z0-9])(?P<passport_letter>[A-PR-WYa-pr-wy])[ ]?(?P<passport_digits>\d{7})(?![A-Za-z0-9])')
+RE_UPI = re.compile(r'(?P<upi_user>[a-zA-Z0-9.\-_]{2,})@(?P<upi_handle>[a-zA-Z]{2,})')
+RE_EMAIL = re.compile(r'(?P<email_user>[a-zA-Z0-9._%+\-]{2,})@(?P<email_domain>[A-Za-z0-9.\-]+\.[A-Za-z]{2,})')
+RE_IP = re.compile(r'\b(?:(?:25[0-5]|2[0-4]\d|[01]?\d\d?)\.){3}(?:25[0-5]|2[0-4]\d|[01]?\d\d?)\b')
 RE_NAME_TWO_PARTS = re.compile(r'^[A-Za-z]{2,}[ ,]+[A-Za-z]{2,}$')
 RE_PINCODE = re.compile(r'(?<!\d)(\d{6})(?!\d)')
-
-PHONE_LIKE_KEYS = {"phone", "contact", "mobile", "alt_phone", "phone_number"}
-ADDRESS_KEYS = {"address", "shipping_address", "billing_address"}
-NAME_KEYS = {"name", "full_name"}
-
-SAFE_NUMERIC_ID_KEYS = {
+# Linear-time RE2 copies of the lookaround-free patterns whose unbounded runs
+# backtrack quadratically in re. RE2's per-call overhead is higher, so it only
+# pays off (and is only used) for values of at least RE2_MIN_LEN characters.
+RE2_MIN_LEN = 64
+RE2_UPI = re2.compile(RE_UPI.pattern) if re2 is not None else None
+RE2_EMAIL = re2.compile(RE_EMAIL.pattern) if re2 is not None else None
+RE_ADDR_TOKENS = re.compile(r'street|st\.|road|rd\.|lane|block|sector|apt|apartment|floor|phase', re.I)
+RE_PRESCREEN = re.compile(r'[@\d]')
+# Whole-blob screens. Anything standalone needs an "@" or a 6+/4-4-4 digit run.
+# Any backslash escape is let through, since "\u" can hide digits and "\t"/"\n"
+# decode to the whitespace that separates aadhar groups; so are exponent floats.
+RE_RAW_PRESCREEN = re.compile(r'@|\\|\d{6}|\d{4}[\s-]?\d{4}[\s-]?\d{4}|\d[eE]')
+RE_RAW_NAME_KEY = re.compile(r'name', re.I)
+RE_RAW_COMBO_KEY = re.compile(r'device_id|ip_address', re.I)
+# orjson turns integers outside the 64-bit range into floats instead of failing;
+# blobs with a run this long are parsed with the stdlib to keep them exact.
+RE_LONG_DIGITS = re.compile(r'\d{19}')
+
+PHONE_LIKE_KEYS = frozenset({"phone", "contact", "mobile", "alt_phone", "phone_number"})
+ADDRESS_KEYS = frozenset({"address", "shipping_address", "billing_address"})
+NAME_KEYS = frozenset({"name", "full_name"})
+
+SAFE_NUMERIC_ID_KEYS = frozenset({
     "order_id", "transaction_id", "product_id", "ticket_id", "warehouse_code", "customer_id",
     "gst_number", "state_code", "booking_reference"
+})
+
+# Combo signal bits for detect_and_redact.
+SIG_NAME = 1
+SIG_EMAIL = 2
+SIG_ADDRESS = 4
+SIG_DEVICE = 8
+SIG_IP = 16
+
+# Lowercased key -> role, so each field is classified with a single dict lookup.
+_KEY_ROLE = (
+    {k: "phone" for k in PHONE_LIKE_KEYS}
+    | {k: "address" for k in ADDRESS_KEYS}
+    | {k: "name" for k in NAME_KEYS}
+    | {k: "safe_id" for k in SAFE_NUMERIC_ID_KEYS}
+    | {"first_name": "name_part", "last_name": "name_part", "device_id": "device", "ip_address": "ip"}
+)
+
+def _mask_phone_match(m: re.Match[str]) -> str:
+    num = m.group("phone_num")
+    return num[:2] + "XXXXXX" + num[-2:]
+
+def _mask_aadhar_match(m: re.Match[str]) -> str:
+    return "XXXX-XXXX-XXXX"
+
+def _mask_passport_match(m: re.Match[str]) -> str:
+    return m.group("passport_letter").upper() + "XXXXXX" + m.group("passport_digits")[-1]
+
+def _mask_upi_match(m: re.Match[str]) -> str:
+    user = m.group("upi_user")
+    return user[:2] + "*" * max(1, len(user) - 3) + user[-1:] + "@" + m.group("upi_handle")
+
+def _mask_email_match(m: re.Match[str]) -> str:
+    user = m.group("email_user")
+    return user[:2] + "*" * max(1, len(user) - 2) + "@" + m.group("email_domain")
+
+def _mask_ip_match(m: re.Match[str]) -> str:
+    return ".".join(m.group(0).split(".")[:2]) + ".*.*"
+
+_MASKERS = {
+    "phone": _mask_phone_match,
+    "aadhar": _mask_aadhar_match,
+    "passport": _mask_passport_match,
+    "upi": _mask_upi_match,
+    "email": _mask_email_match,
+    "ip": _mask_ip_match,
 }
 
-def mask_phone(val: str) -> str:
-    m = RE_PHONE_STRICT.search(val)
-    if not m:
-        return val
-    num = m.group(1)
-    masked = num[:2] + "XXXXXX" + num[-2:]
-    return RE_PHONE_STRICT.sub(masked, val)
-
-def mask_aadhar(val: str) -> str:
-    return RE_AADHAR.sub(lambda m: "XXXX-XXXX-XXXX", val)
-
-def mask_passport(val: str) -> str:
-    return RE_PASSPORT_IN.sub(lambda m: m.group(1).upper() + "XXXXXX" + m.group(2)[-1], val)
-
-def mask_upi(val: str) -> str:
-    return RE_UPI.sub(lambda m: m.group(1)[:2] + "*" * max(1, len(m.group(1)) - 3) + m.group(1)[-1:] + "@" + m.group(2), val)
-
-def mask_email(val: str) -> str:
-    return RE_EMAIL.sub(lambda m: m.group(1)[:2] + "*" * max(1, len(m.group(1)) - 2) + "@" + m.group(2), val)
-
-def mask_ip(val: str) -> str:
-    return RE_IP.sub(lambda m: ".".join(m.group(1).split(".")[:2]) + ".*.*", val)
+_FUSED_PATTERNS = (
+    ("phone", RE_PHONE_STRICT),
+    ("aadhar", RE_AADHAR),
+    ("passport", RE_PASSPORT_IN),
+    ("upi", RE_UPI),
+    ("email", RE_EMAIL),
+    ("ip", RE_IP),
+)
+
+def _fuse(*names: str) -> re.Pattern[str]:
+    return re.compile("|".join(f"(?P<{k}>{p.pattern})" for k, p in _FUSED_PATTERNS if k in names))
+
+# An alternation is leftmost-first across all its patterns, unlike the old
+# sequential passes where UPI ran over the whole value before email did. With
+# both in one alternation an email match can swallow a following "user@" into
+# its domain and leave that address readable. So only values without an "@",
+# where neither can match, are swept in a single fused pass; the rest run the
+# phone/aadhar/passport alternation, then UPI, email and IP in the old order.
+RE_ALL_NO_AT = _fuse("phone", "aadhar", "passport", "ip")
+RE_PRE_AT = _fuse("phone", "aadhar", "passport")
+
+def _mask_any_match(m: re.Match[str]) -> str:
+    return _MASKERS[m.lastgroup](m)  # type: ignore[index]  # lastgroup is always set for fused matches
+
+# Bound .sub methods, looked up once instead of per masked value.
+_SUB_PHONE = RE_PHONE_STRICT.sub
+_SUB_AADHAR = RE_AADHAR.sub
+_SUB_PASSPORT = RE_PASSPORT_IN.sub
+_SUB_UPI = RE_UPI.sub
+_SUB_EMAIL = RE_EMAIL.sub
+_SUB_IP = RE_IP.sub
+_SUB_ALL_NO_AT = RE_ALL_NO_AT.sub
+_SUB_PRE_AT = RE_PRE_AT.sub
+_PRESCREEN_SEARCH = RE_PRESCREEN.search
+
+def _mask_upi(val: str) -> str:
+    if RE2_UPI is not None and len(val) >= RE2_MIN_LEN:
+        return RE2_UPI.sub(_mask_upi_match, val)
+    return _SUB_UPI(_mask_upi_match, val)
+
+def _mask_email(val: str) -> str:
+    if RE2_EMAIL is not None and len(val) >= RE2_MIN_LEN:
+        return RE2_EMAIL.sub(_mask_email_match, val)
+    return _SUB_EMAIL(_mask_email_match, val)
+
+def _mask_all(val: str) -> str:
+    if "@" not in val:
+        return _SUB_ALL_NO_AT(_mask_any_match, val)
+    val = _SUB_PRE_AT(_mask_any_match, val)
+    val = _mask_upi(val)
+    val = _mask_email(val)
+    return _SUB_IP(_mask_ip_match, val)
 
 def mask_name_like(val: str) -> str:
-    parts = re.split(r'\s+', val.strip())
-    return " ".join(p[0].upper() + "XXX" for p in parts if p)
+    return " ".join(p[0].upper() + "XXX" for p in val.split())
 
 def is_phone_value(key: str, val: Any) -> bool:
     if not isinstance(val, str):
         val = str(val)
-    if key in SAFE_NUMERIC_ID_KEYS:
+    return _is_phone(_KEY_ROLE.get(key.lower()), val)
+
+def _is_phone(role: Optional[str], val: str) -> bool:
+    if role == "safe_id":
         return False
-    if key.lower() in PHONE_LIKE_KEYS and RE_PHONE_STRICT.search(val):
+    if role == "phone" and RE_PHONE_STRICT.search(val):
         return True
-    val_stripped = re.sub(r'\D', '', val)
-    return len(val_stripped) == 10 and RE_PHONE_STRICT.search(val) is not None
+    # str.isdecimal is exactly re's \d (Unicode Nd), counted without building a new string
+    return sum(map(str.isdecimal, val)) == 10 and RE_PHONE_STRICT.search(val) is not None
 
 def contains_aadhar(val: Any) -> bool:
     return isinstance(val, str) and RE_AADHAR.search(val) is not None
@@ -68,153 +180,219 @@ def contains_passport(val: Any) -> bool:
     return isinstance(val, str) and RE_PASSPORT_IN.search(val) is not None
 
 def contains_upi(val: Any) -> bool:
-    return isinstance(val, str) and RE_UPI.search(val) is not None
+    if not isinstance(val, str):
+        return False
+    if RE2_UPI is not None and len(val) >= RE2_MIN_LEN:
+        return RE2_UPI.search(val) is not None
+    return RE_UPI.search(val) is not None
 
 def contains_email(val: Any) -> bool:
-    return isinstance(val, str) and RE_EMAIL.search(val) is not None
+    if not isinstance(val, str):
+        return False
+    if RE2_EMAIL is not None and len(val) >= RE2_MIN_LEN:
+        return RE2_EMAIL.search(val) is not None
+    return RE_EMAIL.search(val) is not None
 
 def looks_like_full_name(val: Any) -> bool:
     return isinstance(val, str) and RE_NAME_TWO_PARTS.match(val.strip()) is not None
 
 def contains_ip(val: Any) -> bool:
-    if not isinstance(val, str):
-        return False
-    m = RE_IP.search(val)
-    if not m:
-        return False
-    parts = m.group(1).split(".")
-    for p in parts:
-        try:
-            n = int(p)
-            if n < 0 or n > 255:
-                return False
-        except:
-            return False
-    return True
+    return isinstance(val, str) and RE_IP.search(val) is not None
 
 def contains_address(val: Any) -> bool:
-    if not isinstance(val, str):
-        return False
-    if not RE_PINCODE.search(val):
-        return False
-    street_tokens = ["street", "st.", "road", "rd.", "lane", "block", "sector", "apt", "apartment", "floor", "phase"]
-    has_street = any(t in val.lower() for t in street_tokens)
-    has_number = re.search(r'\d+', val) is not None
-    return has_street and has_number
+    # A pincode match already implies the value has a number in it.
+    return isinstance(val, str) and RE_PINCODE.search(val) is not None and RE_ADDR_TOKENS.search(val) is not None
+
+def _stringify(val: Any) -> str:
+    if isinstance(val, str):
+        return val
+    if isinstance(val, (dict, list)):
+        # Keep non-ASCII as-is: "\uXXXX" escapes would feed the detectors stray
+        # digits and letters, and garble any nested value written back masked.
+        return json.dumps(val, ensure_ascii=False)
+    return str(val)
 
 def detect_and_redact(record: Dict[str, Any]) -> Tuple[bool, Dict[str, Any]]:
     standalone_found = False
-    combo_signals = set()
-    red = dict(record)
-
+    combo_signals = 0
+    # Copied on first write only; records with no PII are returned as-is.
+    red: Optional[Dict[str, Any]] = None
+    items: List[Tuple[Any, Optional[str], str, bool]] = []
     for key, val in record.items():
-        lowkey = str(key).lower()
-        sval = val if isinstance(val, str) else (json.dumps(val) if isinstance(val, (dict, list)) else str(val))
-
-        if is_phone_value(lowkey, sval):
-            standalone_found = True
-            red[key] = mask_phone(sval)
-            continue
-        if contains_aadhar(sval):
-            standalone_found = True
-            red[key] = mask_aadhar(sval)
-            continue
-        if contains_passport(sval):
-            standalone_found = True
-            red[key] = mask_passport(sval)
-            continue
-        if contains_upi(sval):
-            standalone_found = True
-            red[key] = mask_upi(sval)
-            continue
+        sval = _stringify(val)
+        # Every regex check needs a digit or an "@" somewhere in the value.
+        items.append((key, _KEY_ROLE.get(str(key).lower()), sval, _PRESCREEN_SEARCH(sval) is not None))
+
+    for key, role, sval, hit in items:
+        if hit:
+            if _is_phone(role, sval):
+                masked = _SUB_PHONE(_mask_phone_match, sval)
+            elif contains_aadhar(sval):
+                masked = _SUB_AADHAR(_mask_aadhar_match, sval)
+            elif contains_passport(sval):
+                masked = _SUB_PASSPORT(_mask_passport_match, sval)
+            elif contains_upi(sval):
+                masked = _mask_upi(sval)
+            else:
+                masked = None
+            if masked is not None:
+                standalone_found = True
+                if red is None:
+                    red = dict(record)
+                red[key] = masked
+                continue
 
-        if (lowkey in NAME_KEYS and looks_like_full_name(sval)) or (lowkey in {"first_name", "last_name"} and isinstance(sval, str) and len(sval.strip()) >= 2):
-            combo_signals.add("name")
-        if contains_email(sval):
-            combo_signals.add("email")
-        if lowkey in ADDRESS_KEYS and contains_address(sval):
-            combo_signals.add("address")
-        if lowkey in {"device_id"} and isinstance(sval, str) and len(sval.strip()) >= 6:
-            combo_signals.add("device")
-        if lowkey in {"ip_address"} and contains_ip(sval):
-            combo_signals.add("ip")
-
-    combo_score = len(combo_signals)
-    if combo_score >= 2:
-        if (("device" in combo_signals or "ip" in combo_signals) and not (("name" in combo_signals) or ("email" in combo_signals) or ("address" in combo_signals))):
+        if (role == "name" and looks_like_full_name(sval)) or (role == "name_part" and len(sval.strip()) >= 2):
+            combo_signals |= SIG_NAME
+        if hit and contains_email(sval):
+            combo_signals |= SIG_EMAIL
+        if hit and role == "address" and contains_address(sval):
+            combo_signals |= SIG_ADDRESS
+        if role == "device" and len(sval.strip()) >= 6:
+            combo_signals |= SIG_DEVICE
+        if hit and role == "ip" and contains_ip(sval):
+            combo_signals |= SIG_IP
+
+    # x & (x - 1) clears the lowest set bit, so it is non-zero iff two or more signals fired.
+    if combo_signals & (combo_signals - 1):
+        if (combo_signals & (SIG_DEVICE | SIG_IP)) and not (combo_signals & (SIG_NAME | SIG_EMAIL | SIG_ADDRESS)):
             is_pii = standalone_found
         else:
             is_pii = True
     else:
         is_pii = standalone_found
 
-    if is_pii and combo_score > 0:
-        for key, val in record.items():
-            lowkey = str(key).lower()
-            sval = val if isinstance(val, str) else str(val)
+    if not is_pii:
+        return False, record
+    if red is None:
+        red = dict(record)
 
-            if (lowkey in NAME_KEYS and looks_like_full_name(sval)):
+    for key, role, sval, hit in items:
+        if combo_signals:
+            # Wholesale replacements leave nothing for the final sweep to match.
+            if role == "name" and looks_like_full_name(sval):
                 red[key] = mask_name_like(sval)
-            elif lowkey == "first_name" and isinstance(sval, str):
-                red[key] = (sval[0].upper() + "XXX") if sval else sval
-            elif lowkey == "last_name" and isinstance(sval, str):
+                continue
+            elif role == "name_part":
                 red[key] = (sval[0].upper() + "XXX") if sval else sval
-            elif contains_email(sval):
-                red[key] = mask_email(sval)
-            elif lowkey in ADDRESS_KEYS and contains_address(sval):
+                continue
+            elif hit and contains_email(sval):
+                red[key] = _mask_email(sval)
+            elif role == "address" and contains_address(sval):
                 red[key] = "[REDACTED_ADDRESS]"
-            elif lowkey == "ip_address" and contains_ip(sval):
-                red[key] = mask_ip(sval)
-            elif lowkey == "device_id" and isinstance(sval, str) and len(sval.strip()) >= 6:
+                continue
+            elif role == "ip" and contains_ip(sval):
+                red[key] = _SUB_IP(_mask_ip_match, sval)
+            elif role == "device" and len(sval.strip()) >= 6:
                 red[key] = "[REDACTED_DEVICE_ID]"
-
-    if is_pii:
-        for key, val in list(red.items()):
-            if not isinstance(val, str):
                 continue
-            v = val
-            v = mask_phone(v)
-            v = mask_aadhar(v)
-            v = mask_passport(v)
-            v = mask_upi(v)
-            v = mask_email(v)
-            v = mask_ip(v)
-            red[key] = v
-
-    return is_pii, red
-
-def process_csv(in_path: str, out_path: str):
-    df = pd.read_csv(in_path)
-    cols = {c.lower(): c for c in df.columns}
-    if "record_id" not in cols or ("data_json" not in cols and "data" not in cols):
-        raise ValueError("Input CSV must have columns: record_id, data_json")
-    rid_col = cols["record_id"]
-    data_col = cols.get("data_json", cols.get("data"))
-
-    out_rows = []
-    for _, row in df.iterrows():
-        rid = row[rid_col]
-        raw = row[data_col]
+
+        # Values that failed the prescreen cannot match the sweep. Partially
+        # masked values still can: their masker only covered one PII type.
+        if hit:
+            val = red[key]
+            if isinstance(val, str):
+                red[key] = _mask_all(val)
+
+    return True, red
+
+def _may_contain_pii(raw: str) -> bool:
+    if RE_RAW_PRESCREEN.search(raw):
+        return True
+    # name + device/ip is the only combo that needs neither digits nor "@"
+    return RE_RAW_NAME_KEY.search(raw) is not None and RE_RAW_COMBO_KEY.search(raw) is not None
+
+def _parse_raw(raw: str) -> Any:
+    loads = _json_loads if RE_LONG_DIGITS.search(raw) is None else json.loads
+    # Python-repr style blobs ({'a': 'b'}) contain no double quotes and can never
+    # parse as-is, so convert them up front instead of failing a parse first.
+    quoted = '"' in raw
+    text = raw if quoted else raw.replace("'", '"')
+    try:
+        return loads(text)
+    except Exception:
+        pass
+    # orjson rejects NaN, Infinity, 1e400 and lone surrogates that the stdlib
+    # accepts; retry before any quote swap can mangle apostrophes in values.
+    if loads is not json.loads:
         try:
-            data = json.loads(raw)
+            return json.loads(text)
         except Exception:
-            try:
-                fixed = raw.replace("'", '"')
-                data = json.loads(fixed)
-            except Exception:
-                data = {"__raw__": str(raw)}
-
-        is_pii, red = detect_and_redact(data)
-        out_rows.append({
-            "record_id": rid,
-            "redacted_data_json": json.dumps(red, ensure_ascii=False),
-            "is_pii": bool(is_pii)
-        })
-
-    out_df = pd.DataFrame(out_rows, columns=["record_id", "redacted_data_json", "is_pii"])
-    out_df.to_csv(out_path, index=False)
-
-def main():
+            pass
+    if quoted:
+        try:
+            return json.loads(raw.replace("'", '"'))
+        except Exception:
+            pass
+    return {"__raw__": str(raw)}
+
+@functools.lru_cache(maxsize=65536)
+def _process_raw(raw: str) -> Tuple[bool, str]:
+    data = _parse_raw(raw)
+    if not _may_contain_pii(raw):
+        return False, json.dumps(data, ensure_ascii=False)
+    is_pii, red = detect_and_redact(data)
+    return is_pii, json.dumps(red, ensure_ascii=False)
+
+CHUNK_ROWS = 10000
+WRITE_BUFFER_BYTES = 1 << 20
+
+def _process_chunk(rows: List[Tuple[str, str]]) -> List[Tuple[str, str, str]]:
+    out: List[Tuple[str, str, str]] = []
+    for rid, raw in rows:
+        is_pii, redacted = _process_raw(raw)
+        out.append((rid, redacted, "True" if is_pii else "False"))
+    return out
+
+def _iter_chunks(reader: Iterator[List[str]], rid_idx: int, data_idx: int) -> Iterator[List[Tuple[str, str]]]:
+    chunk: List[Tuple[str, str]] = []
+    for row in reader:
+        if not row:
+            continue
+        # A row missing trailing fields is treated as having empty cells.
+        chunk.append((row[rid_idx] if len(row) > rid_idx else "", row[data_idx] if len(row) > data_idx else ""))
+        if len(chunk) >= CHUNK_ROWS:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+def process_csv(in_path: str, out_path: str, workers: Optional[int] = None) -> None:
+    workers = workers or os.cpu_count() or 1
+    # utf-8-sig drops the byte-order mark Excel puts in front of the header.
+    with open(in_path, newline="", encoding="utf-8-sig") as fi, \
+            open(out_path, "w", newline="", encoding="utf-8", buffering=WRITE_BUFFER_BYTES) as fo:
+        reader = csv.reader(fi)
+        writer = csv.writer(fo, lineterminator="\n")
+        header = next(reader, [])
+        cols = {c.lower(): i for i, c in enumerate(header)}
+        if "record_id" not in cols or ("data_json" not in cols and "data" not in cols):
+            raise ValueError("Input CSV must have columns: record_id, data_json")
+        rid_idx = cols["record_id"]
+        data_idx = cols["data_json"] if "data_json" in cols else cols["data"]
+
+        writer.writerow(["record_id", "redacted_data_json", "is_pii"])
+        chunks = _iter_chunks(reader, rid_idx, data_idx)
+        first = next(chunks, None)
+        if first is None:
+            return
+        # Not worth starting a pool for input that fits in a single chunk.
+        if workers == 1 or len(first) < CHUNK_ROWS:
+            for chunk in itertools.chain([first], chunks):
+                writer.writerows(_process_chunk(chunk))
+            return
+
+        # Keep a bounded window of chunks in flight and write them back in input order.
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            pending: Deque[Future[List[Tuple[str, str, str]]]] = deque()
+            for chunk in itertools.chain([first], chunks):
+                pending.append(pool.submit(_process_chunk, chunk))
+                if len(pending) >= 2 * workers:
+                    writer.writerows(pending.popleft().result())
+            while pending:
+                writer.writerows(pending.popleft().result())
+
+def main() -> None:
     if len(sys.argv) < 2:
         print("Usage: python3 detector_virtualISP.py iscp_pii_dataset.csv")
         sys.exit(1)
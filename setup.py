@@ -0,0 +1,18 @@
+from setuptools import setup
+
+# Optional native build: `pip install mypy && python setup.py build_ext --inplace`
+# drops a compiled detector_virtualISP extension next to the .py, which Python
+# then imports in its place. The plain .py keeps working without it, and
+# without mypy installed this just packages the pure-Python module.
+try:
+    from mypyc.build import mypycify
+except ImportError:
+    ext_modules = []
+else:
+    ext_modules = mypycify(["detector_virtualISP.py"])
+
+setup(
+    name="detector_virtualISP",
+    py_modules=["detector_virtualISP"],
+    ext_modules=ext_modules,
+)
@@ -0,0 +1,77 @@
+import time
+
+import pytest
+
+import detector_virtualISP
+from detector_virtualISP import _may_contain_pii, _process_raw, detect_and_redact, process_csv
+
+
+def test_escaped_whitespace_between_aadhar_groups_is_masked():
+    raw = '{"aadhar": "1234\\t5678\\n9012"}'
+    assert _process_raw(raw) == (True, '{"aadhar": "XXXX-XXXX-XXXX"}')
+
+
+def test_stdlib_only_literals_survive_apostrophes():
+    raw = '{"note": "O\'Neil", "v": NaN, "phone": "9876543210"}'
+    assert _process_raw(raw) == (True, '{"note": "O\'Neil", "v": NaN, "phone": "98XXXXXX10"}')
+
+
+def test_nested_non_ascii_value_is_not_garbled():
+    is_pii, red = detect_and_redact({"IP_ADDRESS": ["é@x.com"], "name": "Ram Shah", "email": "ab@cd.com"})
+    assert is_pii
+    assert red["IP_ADDRESS"] == ["é@x.com"]
+
+
+def test_process_csv_accepts_bom_header_and_short_rows(tmp_path):
+    src = tmp_path / "in.csv"
+    src.write_text('\ufeffrecord_id,data_json\n1,"{""phone"": ""9876543210""}"\n2\n', encoding="utf-8")
+    out = tmp_path / "out.csv"
+    process_csv(str(src), str(out), workers=1)
+    assert out.read_text(encoding="utf-8").splitlines() == [
+        "record_id,redacted_data_json,is_pii",
+        '1,"{""phone"": ""98XXXXXX10""}",True',
+        '2,"{""__raw__"": """"}",False',
+    ]
+
+
+def test_back_to_back_addresses_are_both_masked():
+    _, red = detect_and_redact({"email": "ab@cd.comjohn.doe@gmail.com", "phone": "9876543210"})
+    assert red["email"] == "ab*b@cd.c*********e@gmail.com"
+    assert "john.doe" not in red["email"]
+
+
+@pytest.mark.skipif(detector_virtualISP.re2 is None, reason="google-re2 not installed")
+def test_long_at_value_masks_in_linear_time():
+    start = time.perf_counter()
+    is_pii, red = detect_and_redact({"note": "a" * 6000 + "@1", "phone": "9876543210"})
+    assert time.perf_counter() - start < 0.1
+    assert is_pii and red["phone"] == "98XXXXXX10"
+
+
+@pytest.mark.parametrize(
+    "raw, expected",
+    [
+        ('{"name": "Rajesh Kumar", "device_id": "DEVabcdef"}', '{"name": "RXXX KXXX", "device_id": "[REDACTED_DEVICE_ID]"}'),
+        ('{"aadhar": "\\u0031234 5678 9012"}', '{"aadhar": "XXXX-XXXX-XXXX"}'),
+        ('{"phone": 9.876543210e9}', '{"phone": "98XXXXXX10.0"}'),
+        ('{"aadhar": "1234\u20035678\u20039012"}', '{"aadhar": "XXXX-XXXX-XXXX"}'),
+    ],
+)
+def test_raw_screen_lets_hidden_pii_through(raw, expected):
+    assert _may_contain_pii(raw)
+    assert _process_raw(raw) == (True, expected)
+
+
+def test_process_pool_keeps_input_order(tmp_path, monkeypatch):
+    monkeypatch.setattr(detector_virtualISP, "CHUNK_ROWS", 7)
+    src = tmp_path / "in.csv"
+    lines = ["record_id,data_json"]
+    for i in range(60):
+        lines.append(f'{i},"{{""phone"": ""98765{i:05d}"", ""n"": {i}}}"' if i % 3 else f'{i},"{{""city"": ""Pune""}}"')
+    src.write_text("\n".join(lines) + "\n", encoding="utf-8")
+    serial, pooled = tmp_path / "serial.csv", tmp_path / "pooled.csv"
+    process_csv(str(src), str(serial), workers=1)
+    process_csv(str(src), str(pooled), workers=2)
+    out = pooled.read_text(encoding="utf-8")
+    assert out == serial.read_text(encoding="utf-8")
+    assert [line.split(",", 1)[0] for line in out.splitlines()[1:]] == [str(i) for i in range(60)]